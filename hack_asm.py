@@ -4,6 +4,80 @@ and then creates a new .hack file with a binary representation of the code.
 """
 
 import os
+import types
+
+
+# create a binary table for 'computation'
+# part of c-instruction
+COMP_TBL = {}
+COMP_TBL[b'0'] = 0b0101010
+COMP_TBL[b'1'] = 0b0111111
+COMP_TBL[b'-1'] = 0b0111010
+COMP_TBL[b'D'] = 0b0001100
+COMP_TBL[b'A'] = 0b0110000
+COMP_TBL[b'M'] = 0b1110000
+COMP_TBL[b'!D'] = 0b0001101
+COMP_TBL[b'!A'] = 0b0110001
+COMP_TBL[b'!M'] = 0b1110001
+COMP_TBL[b'-D'] = 0b0001101
+COMP_TBL[b'-A'] = 0b0110011
+COMP_TBL[b'-M'] = 0b1110011
+COMP_TBL[b'D+1'] = 0b0011111
+COMP_TBL[b'A+1'] = 0b0110111
+COMP_TBL[b'M+1'] = 0b1110111
+COMP_TBL[b'D-1'] = 0b0001110
+COMP_TBL[b'A-1'] = 0b0110010
+COMP_TBL[b'M-1'] = 0b1110010
+COMP_TBL[b'D+A'] = 0b0000010
+COMP_TBL[b'D+M'] = 0b1000010
+COMP_TBL[b'D-A'] = 0b0010011
+COMP_TBL[b'D-M'] = 0b1010011
+COMP_TBL[b'A-D'] = 0b0000111
+COMP_TBL[b'M-D'] = 0b1000111
+COMP_TBL[b'D&A'] = 0b0000000
+COMP_TBL[b'D&M'] = 0b1000000
+COMP_TBL[b'D|A'] = 0b0010101
+COMP_TBL[b'D|M'] = 0b1010101
+
+# create a binary table for 'destination'
+# part of c-instruction
+DEST_TBL = {}
+DEST_TBL[b'null'] = 0b000
+DEST_TBL[b'M'] = 0b001
+DEST_TBL[b'D'] = 0b010
+DEST_TBL[b'MD'] = 0b011
+DEST_TBL[b'A'] = 0b100
+DEST_TBL[b'AM'] = 0b101
+DEST_TBL[b'AD'] = 0b110
+DEST_TBL[b'AMD'] = 0b111
+
+# create a binary table for 'jump'
+# part of c-instruction
+JMP_TBL = {}
+JMP_TBL[b'null'] = 0b000
+JMP_TBL[b'JGT'] = 0b001
+JMP_TBL[b'JEQ'] = 0b010
+JMP_TBL[b'JGE'] = 0b011
+JMP_TBL[b'JLT'] = 0b100
+JMP_TBL[b'JNE'] = 0b101
+JMP_TBL[b'JLE'] = 0b110
+JMP_TBL[b'JMP'] = 0b111
+
+# cache of already encoded lines (raw line -> 16-bit line)
+_ENCODE_CACHE = {}
+
+# create a read-only table for pre-defined constants
+_CONST_TBL = {b'R%d' % i: i for i in range(16)}
+_CONST_TBL.update({b'SCREEN': 16384, b'KBD': 24576, b'SP': 0, b'LCL': 1,
+                   b'ARG': 2, b'THIS': 3, b'THAT': 4})
+_CONST_TBL = types.MappingProxyType(_CONST_TBL)
+
+# paths to internal directories, computed once at import time
+_ASM_DIR = os.path.join(os.getcwd(), 'ASM_instructions')
+_BIN_DIR = os.path.join(os.getcwd(), 'HACK_machine_code')
+
+# whitespaces to be erased from every line
+_WS = b' \t\n\r\x0b\x0c'
 
 
 def parser(file_loc):
@@ -11,30 +85,24 @@ def parser(file_loc):
     Inputs:
         file_loc - location of file to read
     Output:
-        parced_lst - parced list of lines-strings from the file
+        parced_lst - parced list of lines-bytes from the file
 
-        Each line will be a single line string with no ('\n'), ('\r') or ('\t') characters.
+        Each line will be a single line bytes object with no ('\n'), ('\r') or ('\t') characters.
         Comments starting with ('//') are detected and ignored, as well as empty lines.
     """
 
     # open, read the text file and then break it into lines
-    with open(file_loc, 'r', encoding='utf-8') as input_file:
+    with open(file_loc, 'rb') as input_file:
         asm_lst = input_file.read().splitlines()
     
     # parse the list (whitespaces, empty lines and comments are ignored)
     parsed_lst = []
     for line in asm_lst:
-        if line != '':
-            # eliminate whitespaces
-            mod_line = "".join(line.split())
-            # delete comments
-            if '/' in mod_line:
-                ind = mod_line.index("/")
-                if ind != 0:
-                    mod_line = mod_line[0:ind]
-                    parsed_lst.append(mod_line)
-            else:
-                parsed_lst.append(mod_line)
+        # delete comments, then eliminate whitespaces
+        head, _, _ = line.partition(b'//')
+        mod_line = head.translate(None, _WS)
+        if mod_line != b'':
+            parsed_lst.append(mod_line)
 
     return parsed_lst
 
@@ -49,18 +117,20 @@ def label_table (instr_lst):
     """
     table_dict = {}
     instr_count = 0
+    new_lst = []
 
-    # loop through a copy of the list
-    for line in instr_lst.copy():
-        # in case of a normal instruction, update the counter
-        if '(' not in line:
+    for line in instr_lst:
+        # in case of a normal instruction, keep it and update the counter
+        if b'(' not in line:
+            new_lst.append(line)
             instr_count += 1
-        # if label expression is found, update the table 
-        # and remove the line from the original list
+        # if label expression is found, update the table
         else:
             label = line[1:-1]
             table_dict[label] = instr_count
-            instr_lst.remove(line)
+
+    # replace the contents of the original list in one go
+    instr_lst[:] = new_lst
 
     return table_dict
         
@@ -70,225 +140,111 @@ def const_table():
     Input: none
     Output: a pre-defined table of values for constants
     specified by the HACK language.
-    """
-    table_dict = {}
-
-    for i in range (16):
-        symb = 'R' + str(i)
-        table_dict[symb] = i
-
-    table_dict['SCREEN'] = 16384
-    table_dict['KBD'] = 24576
-
-    table_dict['SP'] = 0
-    table_dict['LCL'] = 1
-    table_dict['ARG'] = 2
-    table_dict['THIS'] = 3
-    table_dict['THAT'] = 4
-
-    return table_dict
-
 
-def var_table (instr_lst, lbl_tbl, const_tbl):
+    The table is built once at import time and is read-only.
     """
-    Inputs: instruction list, tables with labels and constants
-    Output: table-dictionary with names of variables as keys
-    and their RAM addresses as values
+    return _CONST_TBL
 
-    Does not mutate (instr_lst)
-    """
-    table_dict = {}
-    ram_pointer = 16
-
-    for line in instr_lst:
-        if line[0] == '@':
-            if not line[1].isdigit():
-                symb = line[1:]
-                if symb not in lbl_tbl.keys() and symb not in const_tbl.keys() and symb not in table_dict.keys():
-                    table_dict[symb] = ram_pointer
-                    ram_pointer += 1
-    
-    return table_dict
-
-
-def refer_to_num(instr_lst, lbl_tbl, const_tbl, var_tbl):
-    """
-    Inputs: 3 tables for symbols and instruction list
-    Output: new instruction list without references
 
-    Iterates through the list and substitutes every symbol found
-    with a respective value from one of the tables
+def a_instr_encoder(address):
     """
-
-    symb_tbl = {**lbl_tbl, **const_tbl, **var_tbl}
-
-    new_lst = []
-
-    for line in instr_lst:
-        if line[0] == '@':
-            if not line[1].isdigit():
-                symb = line[1:]
-                new_line = '@' + str(symb_tbl[symb])
-                new_lst.append(new_line)
-            else:
-                new_lst.append(line)
-        else:
-            new_lst.append(line)
-
-    return new_lst
-
-
-def a_instr_encoder(instr):
-    """
-    Input: A-type instruction in HACK assembly language (string)
-    Output: Corresponding 16-bit binary command (string)
+    Input: address of A-type instruction (int)
+    Output: Corresponding 16-bit binary command (bytes)
 
     Every A-instruction obeys the formal formatting of type:
     @decimal_number
     """
-    bin_str = bin(int(instr[1:]))[2:]
-    for _ in range(16 - len(bin_str)):
-        bin_str = '0' + bin_str
-
-    return bin_str
+    return format(address, '016b').encode('ascii')
 
 
 def c_instr_encoder(line, comp_tbl, dest_tbl, jmp_tbl):
     """
-    Input: C-type instruction in HACK assembly language (string)
-    Output: Corresponding 16-bit binary command (string)
+    Input: C-type instruction in HACK assembly language (bytes)
+    Output: Corresponding 16-bit binary command (bytes)
 
     Every C-instruction obeys the formal formatting of type:
     destination = computation ; jump condition 
     """
-    ind_eq = - len(line) - 1
-    if '=' in line:
-        ind_eq = line.index('=')
-
-    ind_jmp = len(line)
-    if ';' in line:
-        ind_jmp = line.index(';')
+    # both indices are -1 if the respective part is missing
+    ind_eq = line.find(b'=')
+    ind_jmp = line.find(b';')
 
-    dest = line[:ind_eq]
-    if dest == '':
-        dest = 'null'
+    dest = line[:ind_eq] if ind_eq >= 0 else b'null'
 
-    jmp = line[ind_jmp + 1:]
-    if jmp == '':
-        jmp = 'null'
+    if ind_jmp >= 0:
+        comp = line[ind_eq + 1:ind_jmp]
+        jmp = line[ind_jmp + 1:]
+    else:
+        comp = line[ind_eq + 1:]
+        jmp = b'null'
 
-    comp = line[ind_eq + 1:ind_jmp]
+    # assemble the whole 16-bit word from the integer codes
+    word = 0b111 << 13 | comp_tbl[comp] << 6 | dest_tbl[dest] << 3 | jmp_tbl[jmp]
 
-    return '111' + comp_tbl[comp] + dest_tbl[dest] + jmp_tbl[jmp]
+    return format(word, '016b').encode('ascii')
 
 
-def bin_encoder(instr_lst):
+def bin_encoder(instr_lst, lbl_tbl, const_tbl):
     """
-    Input: a list of instructions in HACK assembly language
-    with all the references (labels, constants, variables)
-    substituted with real values from the previous tables.
+    Inputs: a list of instructions in HACK assembly language
+    without labels, tables with labels and constants
     Output: a list of binary instructions that can be loaded
     directly into HACK ROM memory and executed.
+
+    References are translated into their numeric values on the fly:
+    every unknown symbol becomes a new variable with the next free
+    RAM address (starting from 16) in order of appearance.
     """
+    symb_tbl = {**lbl_tbl, **const_tbl}
+    ram_pointer = 16
 
-    # create a binary table for 'computation'
-    # part of c-instruction
-    comp_tbl = {}
-    comp_tbl['0'] = '0101010'
-    comp_tbl['1'] = '0111111'
-    comp_tbl['-1'] = '0111010'
-    comp_tbl['D'] = '0001100'
-    comp_tbl['A'] = '0110000'
-    comp_tbl['M'] = '1110000'
-    comp_tbl['!D'] = '0001101'
-    comp_tbl['!A'] = '0110001'
-    comp_tbl['!M'] = '1110001'
-    comp_tbl['-D'] = '0001101'
-    comp_tbl['-A'] = '0110011'
-    comp_tbl['-M'] = '1110011'
-    comp_tbl['D+1'] = '0011111'
-    comp_tbl['A+1'] = '0110111'
-    comp_tbl['M+1'] = '1110111'
-    comp_tbl['D-1'] = '0001110'
-    comp_tbl['A-1'] = '0110010'
-    comp_tbl['M-1'] = '1110010'
-    comp_tbl['D+A'] = '0000010'
-    comp_tbl['D+M'] = '1000010'
-    comp_tbl['D-A'] = '0010011'
-    comp_tbl['D-M'] = '1010011'
-    comp_tbl['A-D'] = '0000111'
-    comp_tbl['M-D'] = '1000111'
-    comp_tbl['D&A'] = '0000000'
-    comp_tbl['D&M'] = '1000000'
-    comp_tbl['D|A'] = '0010101'
-    comp_tbl['D|M'] = '1010101'
-
-    # create a binary table for 'destination'
-    # part of c-instruction
-    dest_tbl = {}
-    dest_tbl['null'] = '000'
-    dest_tbl['M'] = '001'
-    dest_tbl['D'] = '010'
-    dest_tbl['MD'] = '011'
-    dest_tbl['A'] = '100'
-    dest_tbl['AM'] = '101'
-    dest_tbl['AD'] = '110'
-    dest_tbl['AMD'] = '111'
-
-    # create a binary table for 'jump'
-    # part of c-instruction
-    jmp_tbl = {}
-    jmp_tbl['null'] = '000'
-    jmp_tbl['JGT'] = '001'
-    jmp_tbl['JEQ'] = '010'
-    jmp_tbl['JGE'] = '011'
-    jmp_tbl['JLT'] = '100'
-    jmp_tbl['JNE'] = '101'
-    jmp_tbl['JLE'] = '110'
-    jmp_tbl['JMP'] = '111'
-
-    bin_lst = []
-    for line in instr_lst:
-        if line[0] == '@':
-            bin_line = a_instr_encoder(line)
-        else:
-            bin_line = c_instr_encoder(line, comp_tbl, dest_tbl, jmp_tbl)
-        bin_lst.append(bin_line)
+    # table of distinct lines in order of their first appearance
+    line_bin = dict.fromkeys(instr_lst)
+
+    # encode every distinct line only once
+    for line in line_bin:
+        bin_line = _ENCODE_CACHE.get(line)
+        if bin_line is None:
+            if not line.startswith(b'@'):
+                bin_line = c_instr_encoder(line, COMP_TBL, DEST_TBL, JMP_TBL)
+                _ENCODE_CACHE[line] = bin_line
+            elif line[1:2].isdigit():
+                bin_line = a_instr_encoder(int(line[1:]))
+                _ENCODE_CACHE[line] = bin_line
+            else:
+                # symbols depend on the program, so they stay out of the cache
+                symb = line[1:]
+                address = symb_tbl.get(symb)
+                if address is None:
+                    address = symb_tbl[symb] = ram_pointer
+                    ram_pointer += 1
+                bin_line = a_instr_encoder(address)
+        line_bin[line] = bin_line
 
-    return bin_lst
+    return [line_bin[line] for line in instr_lst]
 
 
 def main(user_input):
 
-    # computing paths to internal directories
-    curr_dir = os.getcwd()
-    asm_dir = os.path.join(curr_dir, 'ASM_instructions')
-    bin_dir = os.path.join(curr_dir, 'HACK_machine_code')
-    
     # computing absolute path to the .asm and .hack files
-    asm_filename = user_input + '.asm'
-    bin_filename = user_input + '.hack'
-    asm_file_loc = os.path.join(asm_dir, asm_filename)
-    bin_file_loc = os.path.join(bin_dir, bin_filename)
+    asm_file_loc = os.path.join(_ASM_DIR, user_input + '.asm')
+    bin_file_loc = os.path.join(_BIN_DIR, user_input + '.hack')
 
-    # parse the original text into the list of strings-ASM commands
+    # parse the original text into the list of bytes-ASM commands
     instr_lst = parser(asm_file_loc)
 
-    # create 3 temporary tables for all references
+    # create 2 temporary tables for labels and constants
     lbl_tbl = label_table(instr_lst)
     const_tbl = const_table()
-    var_tbl = var_table(instr_lst, lbl_tbl, const_tbl)
-
-    # translate each reference into its numeric value
-    instr_lst = refer_to_num(instr_lst, lbl_tbl, const_tbl, var_tbl)
 
-    # encode each string-line into its binary equivalent
-    bin_lst = bin_encoder(instr_lst)
+    # translate each reference into its numeric value and
+    # encode each bytes-line into its binary equivalent
+    bin_lst = bin_encoder(instr_lst, lbl_tbl, const_tbl)
 
     # write the result to the file
-    with open(bin_file_loc, 'w', encoding='utf-8') as out_f:
-        for line in bin_lst:
-            out_f.write("%s\n" % line)
+    with open(bin_file_loc, 'wb') as out_f:
+        # the empty tail puts a newline after the last line as well
+        out_f.write(b'\n'.join(bin_lst + [b'']))
      
 
 if __name__ == '__main__':